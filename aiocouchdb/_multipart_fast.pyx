@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Alexander Shorin
+# All rights reserved.
+#
+# This software is licensed as described in the file LICENSE, which
+# you should have received as part of this distribution.
+#
+
+# cython: language_level=3
+
+"""Optional C accelerator for the multipart boundary check.
+
+Compiled only when Cython is available at build time; the pure Python
+fallback lives in :mod:`aiocouchdb.multipart`.
+"""
+
+
+cpdef int check_boundary(bytes line, bytes boundary, bytes boundary_last):
+    """Classifies a line against the part boundary.
+
+    Returns 0 for a regular payload line, 1 for the boundary and 2 for
+    the final boundary.
+    """
+    if not line.startswith(boundary):
+        return 0
+    cdef bytes sline = line.rstrip(b'\r\n')
+    if sline == boundary:
+        return 1
+    if sline == boundary_last:
+        return 2
+    return 0
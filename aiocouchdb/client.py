@@ -200,12 +200,16 @@ class HttpRequest(aiohttp.client.ClientRequest):
 
     def update_path(self, params):
         if isinstance(params, dict):
-            params = params.copy()
+            # copy the dict only when there actually is something to fix,
+            # callers mostly pass booleans already stringified
+            converted = None
             for key, value in params.items():
-                if value is True:
-                    params[key] = 'true'
-                elif value is False:
-                    params[key] = 'false'
+                if value is True or value is False:
+                    if converted is None:
+                        converted = params.copy()
+                    converted[key] = 'true' if value else 'false'
+            if converted is not None:
+                params = converted
         return super().update_path(params)
 
 
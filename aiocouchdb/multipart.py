@@ -9,19 +9,616 @@
 
 # flake8: noqa
 
+import base64
+import binascii
+import json
+import zlib
+from collections import deque
+from urllib.parse import parse_qsl
+
+from aiohttp.helpers import parse_mimetype
 from aiohttp.multipart import (
-    MultipartReader,
     MultipartWriter as _MultipartWriter,
-    BodyPartReader,
     BodyPartWriter as _BodyPartWriter,
+    parse_content_disposition,
+    content_disposition_filename,
 )
+from aiohttp.multidict import CIMultiDict
 from aiocouchdb.hdrs import (
+    CONTENT_DISPOSITION,
     CONTENT_ENCODING,
     CONTENT_LENGTH,
     CONTENT_TRANSFER_ENCODING,
+    CONTENT_TYPE,
 )
 
 
+def _py_check_boundary(line, boundary, boundary_last):
+    """Classifies a line against the part boundary.
+
+    Returns 0 for a regular payload line, 1 for the boundary and 2 for
+    the final boundary.
+    """
+    if not line.startswith(boundary):
+        return 0
+    sline = line.rstrip(b'\r\n')
+    if sline == boundary:
+        return 1
+    if sline == boundary_last:
+        return 2
+    return 0
+
+
+try:
+    from aiocouchdb._multipart_fast import check_boundary as _check_boundary
+except ImportError:  # pragma: no cover
+    _check_boundary = _py_check_boundary
+
+
+_CONTENT_DECODERS = {
+    'deflate': lambda data: zlib.decompress(data, -zlib.MAX_WBITS),
+    'gzip': lambda data: zlib.decompress(data, 16 + zlib.MAX_WBITS),
+    'identity': lambda data: data,
+}
+
+_CONTENT_TRANSFER_DECODERS = {
+    'base64': base64.b64decode,
+    'quoted-printable': binascii.a2b_qp,
+}
+
+
+class _PushbackStream(object):
+    """Content stream proxy with a reader-owned pushback buffer.
+
+    The block boundary scanner overreads past the part boundary; the
+    surplus is pushed back here instead of into the private buffer of
+    the underlying stream, so any stream that provides ``read`` and
+    ``readline`` can be used.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._pushback = b''
+        self._readexactly = getattr(stream, 'readexactly', None)
+
+    def unread(self, data):
+        """Returns overread ``data`` back to the head of the stream."""
+        self._pushback = data + self._pushback
+
+    async def read(self, size=None):
+        pushback = self._pushback
+        if pushback:
+            if size is None or size >= len(pushback):
+                self._pushback = b''
+                return pushback
+            self._pushback = pushback[size:]
+            return pushback[:size]
+        return await self._stream.read(size)
+
+    async def readline(self):
+        pushback = self._pushback
+        if not pushback:
+            return await self._stream.readline()
+        idx = pushback.find(b'\n')
+        if idx != -1:
+            self._pushback = pushback[idx + 1:]
+            return pushback[:idx + 1]
+        self._pushback = b''
+        return pushback + await self._stream.readline()
+
+    async def readexactly(self, size):
+        pushback = self._pushback
+        if len(pushback) >= size:
+            self._pushback = pushback[size:]
+            return pushback[:size]
+        self._pushback = b''
+        missing = size - len(pushback)
+        if self._readexactly is not None:
+            return pushback + await self._readexactly(missing)
+        # the underlying stream offers no readexactly, loop over read
+        chunks = [pushback]
+        read = self._stream.read
+        while missing:
+            chunk = await read(missing)
+            if not chunk:
+                raise ValueError('expected %d more bytes, but the stream'
+                                 ' unexpectedly ended' % missing)
+            chunks.append(chunk)
+            missing -= len(chunk)
+        return b''.join(chunks)
+
+
+class MultipartResponseWrapper(object):
+    """Wrapper around the :class:`MultipartBodyReader` to take care about
+    underlying connection and close it when it needs in."""
+
+    def __init__(self, resp, stream):
+        self.resp = resp
+        self.stream = stream
+
+    def at_eof(self):
+        """Returns ``True`` when all response data had been read.
+
+        :rtype: bool
+        """
+        return self.resp.content.at_eof()
+
+    async def next(self):
+        """Emits next multipart reader object."""
+        item = await self.stream.next()
+        if self.stream.at_eof():
+            await self.release()
+        return item
+
+    async def release(self):
+        """Releases the connection gracefully, reading all the content
+        to the void."""
+        await self.resp.release()
+
+
+class BodyPartReader(object):
+    """Multipart reader for single body part."""
+
+    chunk_size = 8192
+
+    def __init__(self, boundary, headers, content):
+        self.headers = headers
+        self._boundary = boundary
+        self._boundary_last = boundary + b'--'
+        if not isinstance(content, _PushbackStream):
+            content = _PushbackStream(content)
+        self._content = content
+        self._at_eof = False
+        length = self.headers.get(CONTENT_LENGTH, None)
+        self._length = int(length) if length is not None else None
+        self._read_bytes = 0
+        self._unread = deque()
+        # parse the headers needed on the decode path once upfront
+        # instead of on every get_charset()/decode() call
+        *_, params = parse_mimetype(headers.get(CONTENT_TYPE, ''))
+        self._charset = params.get('charset')
+        encoding = headers.get(CONTENT_ENCODING)
+        self._encoding = encoding.lower() if encoding is not None else None
+        encoding = headers.get(CONTENT_TRANSFER_ENCODING)
+        self._transfer_encoding = \
+            encoding.lower() if encoding is not None else None
+
+    async def next(self):
+        item = await self.read()
+        if not item:
+            return None
+        return item
+
+    async def read(self, *, decode=False):
+        """Reads body part data.
+
+        :param bool decode: Decodes data following by encoding
+                            method from `Content-Encoding` header. If it missed
+                            data remains untouched
+
+        :rtype: bytes
+        """
+        if self._at_eof:
+            return b''
+        if (decode and self._length is not None and
+                self._transfer_encoding is None and
+                self._encoding in ('gzip', 'deflate')):
+            return await self._read_decompressed()
+        if self._length is None:
+            data = await self._read_to_boundary()
+        elif not self._read_bytes:
+            # the part size is known and nothing was consumed yet:
+            # fetch the whole payload with a single read instead of
+            # looping over chunk_size'd pieces
+            data = await self._content.readexactly(self._length)
+            self._read_bytes = self._length
+            self._at_eof = True
+            if b'\r\n' != (await self._content.readexactly(2)):
+                raise ValueError('reader did not read all the data'
+                                 ' or it is malformed')
+        else:
+            # part was partially consumed already: the remainder size is
+            # still known, fill one preallocated buffer instead of
+            # collecting chunks
+            data = bytearray(self._length - self._read_bytes)
+            offset = 0
+            readinto_chunk = self.readinto_chunk
+            while not self._at_eof:
+                offset += await readinto_chunk(data, offset)
+            data = bytes(data[:offset])
+        if decode:
+            return self.decode(data)
+        return data
+
+    async def read_chunk(self, size=chunk_size):
+        """Reads body part content chunk of the specified size.
+        The body part must has `Content-Length` header with proper value.
+
+        :param int size: chunk size
+
+        :rtype: bytearray
+        """
+        if self._at_eof:
+            return b''
+        assert self._length is not None, \
+            'Content-Length required for chunked read'
+        chunk_size = min(size, self._length - self._read_bytes)
+        chunk = await self._content.read(chunk_size)
+        self._read_bytes += len(chunk)
+        if self._read_bytes == self._length:
+            self._at_eof = True
+            if b'\r\n' != (await self._content.readexactly(2)):
+                raise ValueError('reader did not read all the data'
+                                 ' or it is malformed')
+        return chunk
+
+    async def _read_decompressed(self):
+        """Reads a sized compressed part, inflating it chunk by chunk.
+
+        Decompression is interleaved with the reads, so the compressed
+        payload is dropped as it arrives instead of being buffered as a
+        whole next to the inflated result.
+        """
+        wbits = (16 + zlib.MAX_WBITS if self._encoding == 'gzip'
+                 else -zlib.MAX_WBITS)
+        decomp = zlib.decompressobj(wbits)
+        chunks = []
+        read_chunk = self.read_chunk
+        while not self._at_eof:
+            chunk = await read_chunk(self.chunk_size)
+            if chunk:
+                chunks.append(decomp.decompress(chunk))
+        chunks.append(decomp.flush())
+        return b''.join(chunks)
+
+    async def readinto_chunk(self, buf, offset=0):
+        """Reads a chunk of the body part content into ``buf`` starting
+        at ``offset``.  The body part must has `Content-Length` header
+        with proper value.
+
+        The underlying stream offers no ``readinto`` primitive, so the
+        data is fetched with :meth:`read_chunk` and copied over through
+        a memoryview.
+
+        :param bytearray buf: preallocated writable buffer
+        :param int offset: position in ``buf`` to write to
+
+        :returns: number of bytes written
+        :rtype: int
+        """
+        chunk = await self.read_chunk(len(buf) - offset)
+        size = len(chunk)
+        buf[offset:offset + size] = chunk
+        return size
+
+    async def readline(self):
+        """Reads body part by line by line.
+
+        :rtype: bytearray
+        """
+        if self._at_eof:
+            return b''
+
+        if self._unread:
+            line = self._unread.popleft()
+        else:
+            line = await self._content.readline()
+
+        # the very last boundary may not come with \r\n, so the check
+        # strips it off; a line that merely starts with the boundary is
+        # payload, not a match
+        if _check_boundary(line, self._boundary, self._boundary_last):
+            self._at_eof = True
+            self._unread.append(line)
+            return b''
+        if not line.startswith(self._boundary):
+            next_line = await self._content.readline()
+            if next_line.startswith(self._boundary):
+                line = line[:-2]  # strip CRLF but only once
+            self._unread.append(next_line)
+
+        return line
+
+    async def _read_to_boundary(self):
+        """Reads the payload of a part with unknown length up to the
+        terminating boundary.
+
+        Buffered blocks are scanned with bytes.find() which runs at
+        memchr speed in C, instead of a Python-level boundary comparison
+        per line.  The boundary line itself is left unconsumed for the
+        parent reader.
+        """
+        boundary = self._boundary
+        delimiter = b'\r\n' + boundary
+        keep = len(delimiter) - 1
+        read = self._content.read
+        chunks = []
+        # virtual leading CRLF unifies the "boundary on the first line"
+        # case with the common one; it is cut off the result below
+        buf = b'\r\n'
+        if self._unread:
+            buf += b''.join(self._unread)
+            self._unread.clear()
+        eof = False
+        while True:
+            # a delimiter hit counts only if it forms a complete boundary
+            # line, not just any occurrence of the boundary prefix
+            idx = buf.find(delimiter)
+            while idx != -1:
+                eol = buf.find(b'\r\n', idx + 2)
+                if eol != -1:
+                    sline = buf[idx + 2:eol]
+                elif eof:
+                    # the very last boundary may not come with \r\n
+                    sline = buf[idx + 2:]
+                else:
+                    break  # incomplete line, read more to judge
+                if sline in (boundary, self._boundary_last):
+                    chunks.append(buf[:idx])
+                    # leave the boundary line and the scanned-ahead bytes
+                    # back in the stream for the parent reader
+                    self._content.unread(buf[idx + 2:])
+                    self._at_eof = True
+                    return b''.join(chunks)[2:]
+                idx = buf.find(delimiter, idx + 2)
+            if eof:
+                raise ValueError('reached EOF before the final boundary %r'
+                                 % boundary)
+            # everything ahead of a potential delimiter candidate is payload
+            cut = idx if idx != -1 else len(buf) - keep
+            if cut > 0:
+                chunks.append(buf[:cut])
+                buf = buf[cut:]
+            chunk = await read(8 * self.chunk_size)
+            eof = not chunk
+            buf += chunk
+
+    async def release(self):
+        """Lke :meth:`read`, but reads all the data to the void.
+
+        :rtype: None
+        """
+        if self._at_eof:
+            return
+        if self._length is None:
+            readline = self.readline
+            while not self._at_eof:
+                await readline()
+        else:
+            read_chunk = self.read_chunk
+            chunk_size = self.chunk_size
+            while not self._at_eof:
+                await read_chunk(chunk_size)
+
+    async def text(self, *, encoding=None):
+        """Lke :meth:`read`, but assumes that body part contains text data.
+
+        :param str encoding: Custom text encoding. Overrides specified
+                             in charset param of `Content-Type` header
+
+        :rtype: str
+        """
+        data = await self.read(decode=True)
+        encoding = encoding or self.get_charset(default='latin1')
+        return data.decode(encoding)
+
+    async def json(self, *, encoding=None):
+        """Lke :meth:`read`, but assumes that body parts contains JSON data.
+
+        :param str encoding: Custom JSON encoding. Overrides specified
+                             in charset param of `Content-Type` header
+        """
+        data = await self.read(decode=True)
+        if not data:
+            return None
+        encoding = encoding or self.get_charset(default='utf-8')
+        return json.loads(data.decode(encoding))
+
+    async def form(self, *, encoding=None):
+        """Lke :meth:`read`, but assumes that body parts contains form
+        urlencoded data.
+
+        :param str encoding: Custom form encoding. Overrides specified
+                             in charset param of `Content-Type` header
+        """
+        data = await self.read(decode=True)
+        if not data:
+            return None
+        encoding = encoding or self.get_charset(default='utf-8')
+        return parse_qsl(data.rstrip().decode(encoding), encoding=encoding)
+
+    def at_eof(self):
+        """Returns ``True`` if the boundary was reached or
+        ``False`` otherwise.
+
+        :rtype: bool
+        """
+        return self._at_eof
+
+    def decode(self, data):
+        """Decodes data according the specified `Content-Encoding`
+        or `Content-Transfer-Encoding` headers value.
+
+        Supports ``gzip``, ``deflate`` and ``identity`` encodings for
+        `Content-Encoding` header.
+
+        Supports ``base64``, ``quoted-printable`` encodings for
+        `Content-Transfer-Encoding` header.
+
+        :param bytes data: Data to decode.
+
+        :raises: :exc:`RuntimeError` - if encoding is unknown.
+
+        :rtype: bytes
+        """
+        if self._transfer_encoding is not None:
+            data = self._decode_content_transfer(data)
+        if self._encoding is not None:
+            return self._decode_content(data)
+        return data
+
+    def _decode_content(self, data):
+        decoder = _CONTENT_DECODERS.get(self._encoding)
+        if decoder is None:
+            raise RuntimeError('unknown content encoding: {}'
+                               ''.format(self._encoding))
+        return decoder(data)
+
+    def _decode_content_transfer(self, data):
+        decoder = _CONTENT_TRANSFER_DECODERS.get(self._transfer_encoding)
+        if decoder is None:
+            raise RuntimeError('unknown content transfer encoding: {}'
+                               ''.format(self._transfer_encoding))
+        return decoder(data)
+
+    def get_charset(self, default=None):
+        """Returns charset parameter from ``Content-Type`` header or default.
+
+        The header is parsed once at construction time.
+        """
+        return self._charset or default
+
+    @property
+    def filename(self):
+        """Returns filename specified in Content-Disposition header or ``None``
+        if missed or header is malformed."""
+        _, params = parse_content_disposition(
+            self.headers.get(CONTENT_DISPOSITION))
+        return content_disposition_filename(params)
+
+
+class MultipartReader(object):
+    """Multipart body reader."""
+
+    #: Response wrapper, used when multipart readers constructs from response.
+    response_wrapper_cls = MultipartResponseWrapper
+    #: Multipart reader class, used to handle multipart/* body parts.
+    #: None points to type(self)
+    multipart_reader_cls = None
+    #: Body part reader class for non multipart/* content types.
+    part_reader_cls = BodyPartReader
+
+    def __init__(self, headers, content):
+        self.headers = headers
+        self._boundary = ('--' + self._get_boundary()).encode()
+        self._boundary_last = self._boundary + b'--'
+        if not isinstance(content, _PushbackStream):
+            content = _PushbackStream(content)
+        self._content = content
+        self._last_part = None
+        self._at_eof = False
+        self._unread = []
+
+    @classmethod
+    def from_response(cls, response):
+        """Constructs reader instance from HTTP response.
+
+        :param response: :class:`~aiohttp.client.ClientResponse` instance
+        """
+        obj = cls.response_wrapper_cls(response, cls(response.headers,
+                                                     response.content))
+        return obj
+
+    def at_eof(self):
+        """Returns ``True`` if the final boundary was reached or
+        ``False`` otherwise.
+
+        :rtype: bool
+        """
+        return self._at_eof
+
+    async def next(self):
+        """Emits the next multipart body part."""
+        if self._at_eof:
+            return
+        await self._maybe_release_last_part()
+        await self._read_boundary()
+        if self._at_eof:  # we just read the last boundary, nothing to do there
+            return
+        self._last_part = await self.fetch_next_part()
+        return self._last_part
+
+    async def release(self):
+        """Reads all the body parts to the void till the final boundary."""
+        next_part = self.next
+        while not self._at_eof:
+            item = await next_part()
+            if item is None:
+                break
+            await item.release()
+
+    async def fetch_next_part(self):
+        """Returns the next body part reader."""
+        headers = await self._read_headers()
+        return self._get_part_reader(headers)
+
+    def _get_part_reader(self, headers):
+        """Dispatches the response by the `Content-Type` header, returning
+        suitable reader instance.
+
+        :param dict headers: Response headers
+        """
+        ctype = headers.get(CONTENT_TYPE, '')
+        # a prefix check against the raw header is enough to dispatch
+        # here, no need to parse the whole mimetype per part
+        if ctype[:10].lower() == 'multipart/':
+            if self.multipart_reader_cls is None:
+                return type(self)(headers, self._content)
+            return self.multipart_reader_cls(headers, self._content)
+        else:
+            return self.part_reader_cls(self._boundary, headers, self._content)
+
+    def _get_boundary(self):
+        mtype, *_, params = parse_mimetype(self.headers[CONTENT_TYPE])
+
+        assert mtype == 'multipart', 'multipart/* content type expected'
+
+        if 'boundary' not in params:
+            raise ValueError('boundary missed for Content-Type: %s'
+                             % self.headers[CONTENT_TYPE])
+
+        boundary = params['boundary']
+        if len(boundary) > 70:
+            raise ValueError('boundary %r is too long (70 chars max)'
+                             % boundary)
+
+        return boundary
+
+    async def _readline(self):
+        if self._unread:
+            return self._unread.pop()
+        return await self._content.readline()
+
+    async def _read_boundary(self):
+        chunk = await self._readline()
+        status = _check_boundary(chunk, self._boundary, self._boundary_last)
+        if status == 2:
+            self._at_eof = True
+        elif status == 0:
+            raise ValueError('Invalid boundary %r, expected %r'
+                             % (chunk.rstrip(), self._boundary))
+
+    async def _read_headers(self):
+        headers = CIMultiDict()
+        readline = self._content.readline
+        while True:
+            line = (await readline()).rstrip(b'\r\n')
+            if not line:
+                break
+            name, _, value = line.partition(b':')
+            headers.add(name.strip().decode('latin1'),
+                        value.strip().decode('latin1'))
+        return headers
+
+    async def _maybe_release_last_part(self):
+        """Ensures that the last read body part is read completely."""
+        if self._last_part is not None:
+            if not self._last_part.at_eof():
+                await self._last_part.release()
+            self._unread.extend(self._last_part._unread)
+            self._last_part = None
+
+
 class BodyPartWriter(_BodyPartWriter):
 
     def calc_content_length(self):
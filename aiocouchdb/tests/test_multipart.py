@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Alexander Shorin
+# All rights reserved.
+#
+# This software is licensed as described in the file LICENSE, which
+# you should have received as part of this distribution.
+#
+
+import asyncio
+import io
+import zlib
+
+import aiocouchdb.multipart
+
+from . import utils
+
+
+class Stream(object):
+
+    def __init__(self, content, limit=None):
+        self.content = io.BytesIO(content)
+        self.limit = limit
+
+    @asyncio.coroutine
+    def read(self, size=None):
+        if self.limit is not None and size is not None:
+            size = min(size, self.limit)
+        return self.content.read(size)
+
+    @asyncio.coroutine
+    def readline(self):
+        return self.content.readline()
+
+
+class BodyPartReaderTestCase(utils.TestCase):
+
+    def make_reader(self, content, headers=None, limit=None):
+        return aiocouchdb.multipart.BodyPartReader(
+            b'--:', headers or {}, Stream(content, limit))
+
+    def test_read_sized(self):
+        reader = self.make_reader(b'some data\r\n--:--',
+                                  headers={'CONTENT-LENGTH': '9'})
+        data = yield from reader.read()
+        self.assertEqual(b'some data', data)
+        self.assertTrue(reader.at_eof())
+
+    def test_read_sized_stingy_stream(self):
+        # the stream hands the data out a few bytes at a time
+        reader = self.make_reader(b'some data\r\n--:--',
+                                  headers={'CONTENT-LENGTH': '9'},
+                                  limit=3)
+        data = yield from reader.read()
+        self.assertEqual(b'some data', data)
+        self.assertTrue(reader.at_eof())
+
+    def test_read_chunk(self):
+        reader = self.make_reader(b'some data\r\n--:--',
+                                  headers={'CONTENT-LENGTH': '9'})
+        chunks = []
+        while not reader.at_eof():
+            chunks.append((yield from reader.read_chunk(4)))
+        self.assertEqual(b'some data', b''.join(chunks))
+
+    def test_read_after_read_chunk(self):
+        reader = self.make_reader(b'some data\r\n--:--',
+                                  headers={'CONTENT-LENGTH': '9'})
+        chunk = yield from reader.read_chunk(4)
+        self.assertEqual(b'some', chunk)
+        data = yield from reader.read()
+        self.assertEqual(b' data', data)
+        self.assertTrue(reader.at_eof())
+
+    def test_read_unsized(self):
+        reader = self.make_reader(b'some data\r\n--:\r\n')
+        data = yield from reader.read()
+        self.assertEqual(b'some data', data)
+        self.assertTrue(reader.at_eof())
+
+    def test_read_unsized_across_read_sizes(self):
+        content = b'0123456789' * 4096 + b'\r\n--:--'
+        for limit in (1, 3, 7, None):
+            reader = self.make_reader(content, limit=limit)
+            data = yield from reader.read()
+            self.assertEqual(b'0123456789' * 4096, data)
+            self.assertTrue(reader.at_eof())
+
+    def test_read_unsized_boundary_like_payload(self):
+        # lines that merely start with the boundary are payload
+        reader = self.make_reader(b'--:part of the data\r\n'
+                                  b'--:-- is not a boundary here\r\n'
+                                  b'--:\r\n')
+        data = yield from reader.read()
+        self.assertEqual(b'--:part of the data\r\n'
+                         b'--:-- is not a boundary here', data)
+        self.assertTrue(reader.at_eof())
+
+    def test_read_unsized_final_boundary_without_crlf(self):
+        reader = self.make_reader(b'some data\r\n--:--')
+        data = yield from reader.read()
+        self.assertEqual(b'some data', data)
+        self.assertTrue(reader.at_eof())
+
+    def test_read_unsized_missing_boundary(self):
+        reader = self.make_reader(b'some data without a boundary')
+        with self.assertRaises(ValueError):
+            yield from reader.read()
+
+    def test_readline(self):
+        reader = self.make_reader(b'some data\r\nmore data\r\n--:--')
+        lines = []
+        while not reader.at_eof():
+            lines.append((yield from reader.readline()))
+        self.assertEqual([b'some data\r\n', b'more data', b''], lines)
+
+    def test_read_gzip(self):
+        compressed = self.compress(b'some data' * 1024,
+                                   16 + zlib.MAX_WBITS)
+        reader = self.make_reader(
+            compressed + b'\r\n--:--',
+            headers={'CONTENT-ENCODING': 'gzip',
+                     'CONTENT-LENGTH': str(len(compressed))})
+        data = yield from reader.read(decode=True)
+        self.assertEqual(b'some data' * 1024, data)
+        self.assertTrue(reader.at_eof())
+
+    def test_read_deflate(self):
+        compressed = self.compress(b'some data' * 1024, -zlib.MAX_WBITS)
+        reader = self.make_reader(
+            compressed + b'\r\n--:--',
+            headers={'CONTENT-ENCODING': 'deflate',
+                     'CONTENT-LENGTH': str(len(compressed))})
+        data = yield from reader.read(decode=True)
+        self.assertEqual(b'some data' * 1024, data)
+        self.assertTrue(reader.at_eof())
+
+    def test_release(self):
+        stream = Stream(b'some data\r\n--:\r\nnext part')
+        reader = aiocouchdb.multipart.BodyPartReader(b'--:', {}, stream)
+        yield from reader.release()
+        self.assertTrue(reader.at_eof())
+
+    def compress(self, data, wbits):
+        comp = zlib.compressobj(9, zlib.DEFLATED, wbits)
+        return comp.compress(data) + comp.flush()
+
+
+class MultipartReaderTestCase(utils.TestCase):
+
+    def make_reader(self, content, limit=None):
+        return aiocouchdb.multipart.MultipartReader(
+            {'CONTENT-TYPE': 'multipart/related;boundary=:'},
+            Stream(content, limit))
+
+    def test_next(self):
+        for limit in (1, 3, 7, None):
+            reader = self.make_reader(b'--:\r\n'
+                                      b'Content-Type: application/json\r\n'
+                                      b'\r\n'
+                                      b'{"foo": "bar"}\r\n'
+                                      b'--:\r\n'
+                                      b'Content-Type: text/plain\r\n'
+                                      b'Content-Length: 9\r\n'
+                                      b'\r\n'
+                                      b'some data\r\n'
+                                      b'--:--\r\n', limit)
+            part = yield from reader.next()
+            doc = yield from part.json()
+            self.assertEqual({'foo': 'bar'}, doc)
+
+            part = yield from reader.next()
+            data = yield from part.read()
+            self.assertEqual(b'some data', data)
+
+            part = yield from reader.next()
+            self.assertIsNone(part)
+            self.assertTrue(reader.at_eof())
+
+    def test_read_headers(self):
+        reader = self.make_reader(b'--:\r\n'
+                                  b'Content-Type:   text/plain  \r\n'
+                                  b'X-Custom-Header: some value\r\n'
+                                  b'\r\n'
+                                  b'some data\r\n'
+                                  b'--:--\r\n')
+        part = yield from reader.next()
+        self.assertEqual('text/plain', part.headers.get('CONTENT-TYPE'))
+        self.assertEqual('some value', part.headers.get('X-CUSTOM-HEADER'))
+
+    def test_invalid_boundary(self):
+        reader = self.make_reader(b'---:\r\n'
+                                  b'\r\n'
+                                  b'some data\r\n'
+                                  b'---:--\r\n')
+        with self.assertRaises(ValueError):
+            yield from reader.next()
+
+    def test_release(self):
+        reader = self.make_reader(b'--:\r\n'
+                                  b'Content-Type: application/json\r\n'
+                                  b'\r\n'
+                                  b'{"foo": "bar"}\r\n'
+                                  b'--:\r\n'
+                                  b'Content-Type: text/plain\r\n'
+                                  b'Content-Length: 9\r\n'
+                                  b'\r\n'
+                                  b'some data\r\n'
+                                  b'--:--\r\n')
+        yield from reader.release()
+        self.assertTrue(reader.at_eof())
@@ -345,6 +345,8 @@ def modify_server(section, option, value):
             assert oldval == value, ('{} != {}'.format(oldval, value))
 
     def decorator(f):
+        f = asyncio.coroutine(f)
+
         @functools.wraps(f)
         def wrapper(testcase, **kwargs):
             server, cookie = testcase.server, testcase.cookie
@@ -377,6 +379,8 @@ def with_fixed_admin_party(username, password):
                                             auth=cookie)
 
     def decorator(f):
+        f = asyncio.coroutine(f)
+
         @functools.wraps(f)
         def wrapper(testcase, **kwargs):
             server, cookie = testcase.server, testcase.cookie
@@ -406,6 +410,8 @@ def using_database(dbarg='db'):
             pass
 
     def decorator(f):
+        f = asyncio.coroutine(f)
+
         @functools.wraps(f)
         def wrapper(testcase, **kwargs):
             server, cookie = testcase.server, testcase.cookie
@@ -471,6 +477,8 @@ def dbname(idx=None, prefix='test/aiocouchdb'):
 
 def run_for(*targets):
     def decorator(f):
+        f = asyncio.coroutine(f)
+
         @functools.wraps(f)
         @unittest.skipIf(TARGET not in targets,
                          'runs only for targets: %s' % ', '.join(targets))
@@ -482,6 +490,8 @@ def run_for(*targets):
 
 def skip_for(*targets):
     def decorator(f):
+        f = asyncio.coroutine(f)
+
         @functools.wraps(f)
         @unittest.skipIf(TARGET in targets,
                          'skips for targets: %s' % ', '.join(targets))
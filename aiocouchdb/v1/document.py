@@ -7,7 +7,6 @@
 # you should have received as part of this distribution.
 #
 
-import asyncio
 import json
 import io
 import uuid
@@ -33,6 +32,9 @@ __all__ = (
 )
 
 
+_BOOL_STR = {True: 'true', False: 'false'}
+
+
 class Document(object):
     """Implementation of :ref:`CouchDB Document API <api/doc>`."""
 
@@ -65,8 +67,7 @@ class Document(object):
         """Returns a document id specified in class constructor."""
         return self._docid
 
-    @asyncio.coroutine
-    def att(self, attname, *, auth=None):
+    async def att(self, attname, *, auth=None):
         """Returns :class:`~aiocouchdb.v1.attachment.Attachment` instance
         against specified attachment.
 
@@ -80,14 +81,13 @@ class Document(object):
         :rtype: :attr:`aiocouchdb.v1.document.Document.attachment_class`
         """
         att = self[attname]
-        resp = yield from att.resource.head(auth=auth)
+        resp = await att.resource.head(auth=auth)
         if resp.status != 404:
-            yield from resp.maybe_raise_error()
-        yield from resp.release()
+            await resp.maybe_raise_error()
+        await resp.release()
         return att
 
-    @asyncio.coroutine
-    def exists(self, rev=None, *, auth=None):
+    async def exists(self, rev=None, *, auth=None):
         """Checks if `document exists`_ in the database. Assumes success
         on receiving response with `200 OK` status.
 
@@ -101,12 +101,17 @@ class Document(object):
         params = {}
         if rev is not None:
             params['rev'] = rev
-        resp = yield from self.resource.head(auth=auth, params=params)
-        yield from resp.release()
+        resp = await self.resource.head(auth=auth, params=params)
+        if resp.content.at_eof():
+            # HEAD responses carry no body: release the connection
+            # synchronously instead of spending a coroutine on draining
+            # nothing
+            resp.close()
+        else:
+            await resp.release()
         return resp.status == 200
 
-    @asyncio.coroutine
-    def modified(self, rev, *, auth=None):
+    async def modified(self, rev, *, auth=None):
         """Checks if `document was modified`_ in database since specified
         revision.
 
@@ -118,14 +123,13 @@ class Document(object):
         .. _document was modified: http://docs.couchdb.org/en/latest/api/document/common.html#head--db-docid
         """
         qrev = '"%s"' % rev
-        resp = yield from self.resource.head(auth=auth,
-                                             headers={IF_NONE_MATCH: qrev})
-        yield from resp.maybe_raise_error()
-        yield from resp.release()
+        resp = await self.resource.head(auth=auth,
+                                        headers={IF_NONE_MATCH: qrev})
+        await resp.maybe_raise_error()
+        await resp.release()
         return resp.status != 304
 
-    @asyncio.coroutine
-    def rev(self, *, auth=None):
+    async def rev(self, *, auth=None):
         """Returns current document revision by using `HEAD request`_.
 
         :param auth: :class:`aiocouchdb.authn.AuthProvider` instance
@@ -134,24 +138,23 @@ class Document(object):
 
         .. _HEAD request: http://docs.couchdb.org/en/latest/api/document/common.html#head--db-docid
         """
-        resp = yield from self.resource.head(auth=auth)
-        yield from resp.maybe_raise_error()
-        yield from resp.release()
+        resp = await self.resource.head(auth=auth)
+        await resp.maybe_raise_error()
+        await resp.release()
         return resp.headers[ETAG].strip('"')
 
-    @asyncio.coroutine
-    def get(self, rev=None, *,
-            auth=None,
-            att_encoding_info=None,
-            attachments=None,
-            atts_since=None,
-            conflicts=None,
-            deleted_conflicts=None,
-            local_seq=None,
-            meta=None,
-            open_revs=None,
-            revs=None,
-            revs_info=None):
+    async def get(self, rev=None, *,
+                  auth=None,
+                  att_encoding_info=None,
+                  attachments=None,
+                  atts_since=None,
+                  conflicts=None,
+                  deleted_conflicts=None,
+                  local_seq=None,
+                  meta=None,
+                  open_revs=None,
+                  revs=None,
+                  revs_info=None):
         """`Returns a document`_ object.
 
         :param str rev: Document revision
@@ -178,29 +181,41 @@ class Document(object):
 
         .. _Returns a document: http://docs.couchdb.org/en/latest/api/document/common.html#get--db-docid
         """
-        params = dict((key, value)
-                      for key, value in locals().items()
-                      if (key not in {'self', 'auth'} and
-                          value is not None))
-
         if atts_since is not None:
-            params['atts_since'] = json.dumps(atts_since)
-
+            atts_since = json.dumps(atts_since)
         if open_revs is not None and open_revs != 'all':
-            params['open_revs'] = json.dumps(open_revs)
-
-        resp = yield from self.resource.get(auth=auth, params=params)
-        yield from resp.maybe_raise_error()
-        return (yield from resp.json())
-
-    @asyncio.coroutine
-    def get_open_revs(self, *open_revs,
-                      auth=None,
-                      att_encoding_info=None,
-                      atts_since=None,
-                      latest=None,
-                      local_seq=None,
-                      revs=None):
+            open_revs = json.dumps(open_revs)
+
+        params = {}
+        for key, value in (('att_encoding_info', att_encoding_info),
+                           ('attachments', attachments),
+                           ('atts_since', atts_since),
+                           ('conflicts', conflicts),
+                           ('deleted_conflicts', deleted_conflicts),
+                           ('local_seq', local_seq),
+                           ('meta', meta),
+                           ('open_revs', open_revs),
+                           ('rev', rev),
+                           ('revs', revs),
+                           ('revs_info', revs_info)):
+            if value is not None:
+                # stringify booleans here so the URL builder encodes the
+                # params as is, without one more conversion pass
+                if value is True or value is False:
+                    value = _BOOL_STR[value]
+                params[key] = value
+
+        resp = await self.resource.get(auth=auth, params=params)
+        await resp.maybe_raise_error()
+        return await resp.json()
+
+    async def get_open_revs(self, *open_revs,
+                            auth=None,
+                            att_encoding_info=None,
+                            atts_since=None,
+                            latest=None,
+                            local_seq=None,
+                            revs=None):
         """Returns reader for multiple document conflicted revisions with their
         attachments.
 
@@ -238,24 +253,23 @@ class Document(object):
 
         params['open_revs'] = json.dumps(open_revs) if open_revs else 'all'
 
-        resp = yield from self.resource.get(auth=auth,
-                                            headers={ACCEPT: 'multipart/mixed'},
-                                            params=params)
-        yield from resp.maybe_raise_error()
+        resp = await self.resource.get(auth=auth,
+                                       headers={ACCEPT: 'multipart/mixed'},
+                                       params=params)
+        await resp.maybe_raise_error()
         reader = OpenRevsMultipartReader.from_response(resp)
         return reader
 
-    @asyncio.coroutine
-    def get_with_atts(self, rev=None, *,
-                      auth=None,
-                      att_encoding_info=None,
-                      atts_since=None,
-                      conflicts=None,
-                      deleted_conflicts=None,
-                      local_seq=None,
-                      meta=None,
-                      revs=None,
-                      revs_info=None):
+    async def get_with_atts(self, rev=None, *,
+                            auth=None,
+                            att_encoding_info=None,
+                            atts_since=None,
+                            conflicts=None,
+                            deleted_conflicts=None,
+                            local_seq=None,
+                            meta=None,
+                            revs=None,
+                            revs_info=None):
         """Returns document with attachments.
 
         This method is more optimal than :func:`get(attachments=true)
@@ -291,19 +305,19 @@ class Document(object):
         if atts_since is not None:
             params['atts_since'] = json.dumps(atts_since)
 
-        resp = yield from self.resource.get(
+        resp = await self.resource.get(
             auth=auth,
             headers={ACCEPT: 'multipart/related, application/json'},
             params=params)
 
-        yield from resp.maybe_raise_error()
+        await resp.maybe_raise_error()
 
         if resp.headers[CONTENT_TYPE].startswith('application/json'):
             # WARNING! Here be Hacks!
             # If document has no attachments, CouchDB returns it as JSON
             # so we have to fake multipart response in the name of consistency.
             # However, this hack may not lasts for too long.
-            data = yield from resp.read()
+            data = await resp.read()
             boundary = str(uuid.uuid4())
             headers = dict(resp.headers.items())
             headers[CONTENT_TYPE] = 'multipart/related;boundary=%s' % boundary
@@ -317,13 +331,12 @@ class Document(object):
 
         return DocAttachmentsMultipartReader.from_response(resp)
 
-    @asyncio.coroutine
-    def update(self, doc, *,
-               atts=None,
-               auth=None,
-               batch=None,
-               new_edits=None,
-               rev=None):
+    async def update(self, doc, *,
+                     atts=None,
+                     auth=None,
+                     batch=None,
+                     new_edits=None,
+                     rev=None):
         """`Updates a document`_ on server.
 
         :param dict doc: Document object. Should implement
@@ -345,10 +358,13 @@ class Document(object):
 
         .. _Updates a document: http://docs.couchdb.org/en/latest/api/document/common.html#put--db-docid
         """
-        params = dict((key, value)
-                      for key, value in locals().items()
-                      if (key not in {'self', 'doc', 'auth', 'atts'} and
-                          value is not None))
+        if new_edits is not None:
+            new_edits = _BOOL_STR[new_edits]
+        params = {key: value
+                  for key, value in (('batch', batch),
+                                     ('new_edits', new_edits),
+                                     ('rev', rev))
+                  if value is not None}
 
         if not isinstance(doc, MutableMapping):
             raise TypeError('MutableMapping instance expected, like a dict')
@@ -391,22 +407,21 @@ class Document(object):
             # workaround of COUCHDB-2295
             writer.headers[CONTENT_LENGTH] = str(writer.calc_content_length())
 
-            resp = yield from self.resource.put(auth=auth,
-                                                data=writer,
-                                                params=params)
+            resp = await self.resource.put(auth=auth,
+                                           data=writer,
+                                           params=params)
 
             for info in doc['_attachments'].values():
                 info.pop('follows')
                 info['stub'] = True
         else:
-            resp = yield from self.resource.put(auth=auth,
-                                                data=doc,
-                                                params=params)
-        yield from resp.maybe_raise_error()
-        return (yield from resp.json())
-
-    @asyncio.coroutine
-    def delete(self, rev, *, auth=None, preserve_content=None):
+            resp = await self.resource.put(auth=auth,
+                                           data=doc,
+                                           params=params)
+        await resp.maybe_raise_error()
+        return await resp.json()
+
+    async def delete(self, rev, *, auth=None, preserve_content=None):
         """`Deletes a document`_ from server.
 
         By default document will be deleted using `DELETE` HTTP method.
@@ -429,17 +444,16 @@ class Document(object):
         """
         params = {'rev': rev}
         if preserve_content:
-            doc = yield from self.get(rev=rev)
+            doc = await self.get(rev=rev)
             doc['_deleted'] = True
-            resp = yield from self.resource.put(auth=auth, data=doc,
-                                                params=params)
+            resp = await self.resource.put(auth=auth, data=doc,
+                                           params=params)
         else:
-            resp = yield from self.resource.delete(auth=auth, params=params)
-        yield from resp.maybe_raise_error()
-        return (yield from resp.json())
+            resp = await self.resource.delete(auth=auth, params=params)
+        await resp.maybe_raise_error()
+        return await resp.json()
 
-    @asyncio.coroutine
-    def copy(self, newid, rev=None, *, auth=None):
+    async def copy(self, newid, rev=None, *, auth=None):
         """`Copies a document`_ with the new ID within the same database.
 
         :param str newid: New document ID
@@ -455,17 +469,16 @@ class Document(object):
         if rev is not None:
             dest += '?rev=' + rev
         headers = {DESTINATION: dest}
-        resp = yield from self.resource.copy(auth=auth, headers=headers)
-        yield from resp.maybe_raise_error()
-        return (yield from resp.json())
+        resp = await self.resource.copy(auth=auth, headers=headers)
+        await resp.maybe_raise_error()
+        return await resp.json()
 
 
 class DocAttachmentsMultipartReader(MultipartReader):
     """Special multipart reader optimized for requesting single document with
     attachments. Matches output with :class:`OpenRevsMultipartReader`."""
 
-    @asyncio.coroutine
-    def next(self):
+    async def next(self):
         """Emits a tuple of document object (:class:`dict`) and multipart reader
         of the followed attachments (if any).
 
@@ -476,7 +489,7 @@ class DocAttachmentsMultipartReader(MultipartReader):
         if part is not None and part.at_eof():
             self._at_eof = True
 
-        reader = yield from super().next()
+        reader = await super().next()
 
         if self._at_eof:
             return None, None
@@ -486,7 +499,7 @@ class DocAttachmentsMultipartReader(MultipartReader):
         self._last_part = attsreader
         attsreader._unread = reader._unread
 
-        doc = yield from reader.json()
+        doc = await reader.json()
 
         return doc, attsreader
 
@@ -497,22 +510,21 @@ class OpenRevsMultipartReader(MultipartReader):
 
     multipart_reader_cls = MultipartReader
 
-    @asyncio.coroutine
-    def next(self):
+    async def next(self):
         """Emits a tuple of document object (:class:`dict`) and multipart reader
         of the followed attachments (if any).
 
         :rtype: tuple
         """
-        reader = yield from super().next()
+        reader = await super().next()
 
         if self._at_eof:
             return None, None
 
         if isinstance(reader, self.multipart_reader_cls):
-            part = yield from reader.next()
-            doc = yield from part.json()
+            part = await reader.next()
+            doc = await part.json()
         else:
-            doc = yield from reader.json()
+            doc = await reader.json()
 
         return doc, reader
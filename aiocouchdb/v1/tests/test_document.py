@@ -157,6 +157,8 @@ class DocumentTestCase(utils.DocumentTestCase):
             yield from self.doc.get(**{key: value})
             if key in ('atts_since', 'open_revs'):
                 value = json.dumps(value)
+            elif isinstance(value, bool):
+                value = 'true' if value else 'false'
             self.assert_request_called_with('GET', *self.request_path(),
                                             params={key: value})
 
@@ -318,6 +320,8 @@ class DocumentTestCase(utils.DocumentTestCase):
 
         for key, value in all_params.items():
             yield from self.doc.update({}, **{key: value})
+            if isinstance(value, bool):
+                value = 'true' if value else 'false'
             self.assert_request_called_with('PUT', *self.request_path(),
                                             data={},
                                             params={key: value})
@@ -17,8 +17,8 @@ setup_dir = os.path.dirname(__file__)
 mod = imp.load_module(
     'version', *imp.find_module('version', [join(setup_dir, 'aiocouchdb')]))
 
-if sys.version_info < (3, 3):
-    raise RuntimeError('aiocouchdb requires Python 3.3+')
+if sys.version_info < (3, 5):
+    raise RuntimeError('aiocouchdb requires Python 3.5+')
 
 long_description = ''.join([
     open(join(setup_dir, 'README.rst')).read().strip(),
@@ -31,6 +31,15 @@ Changes
     open(join(setup_dir, 'CHANGES.rst')).read().strip()
 ])
 
+# The C accelerator for the multipart boundary check is optional:
+# without Cython the pure Python fallback is used.
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = cythonize([join('aiocouchdb', '_multipart_fast.pyx')])
+
 
 setup(
     name='aiocouchdb',
@@ -51,13 +60,13 @@ setup(
         'Operating System :: OS Independent',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.3',
-        'Programming Language :: Python :: 3.4',
+        'Programming Language :: Python :: 3.5',
         'Topic :: Database :: Front-Ends',
         'Topic :: Software Development :: Libraries :: Python Modules'
     ],
 
     packages=find_packages(),
+    ext_modules=ext_modules,
     test_suite='nose.collector',
     zip_safe=False,
 